@@ -5,24 +5,39 @@ Equivalente ao entrypoint.sh + container mediamtx, mas rodando nativamente.
 
 Fluxo:
   1. Lê iot_devices.yml
-  2. Autentica API key no backend (registra local_api_url para PTZ)
-  3. Registra dispositivos IoT no backend
-  4. Gera mediamtx.yml com os paths de câmeras RTSP
-  5. Inicia o binário mediamtx como subprocesso
-  6. Sobe HTTP API na porta 9000 para comandos PTZ (thread separada)
-  7. Monitora e reinicia se cair
+  2. Testa as câmeras via RTSP OPTIONS (em paralelo), gera mediamtx.yml só com
+     as que respondem e inicia o binário mediamtx (vídeo local primeiro)
+  3. Em paralelo, sem bloquear o vídeo local:
+     - autentica API key no backend (registra local_api_url para PTZ e o
+       endpoint WebRTC local com os paths das câmeras, para playback na LAN)
+     - sincroniza dispositivos IoT com o backend (hash + delta)
+     - configura as câmeras ONVIF da API PTZ (HTTP na porta 9000)
+     - inicia polling assíncrono dos dispositivos IoT (reporta só mudanças)
+  4. Loga relatório de tempo de inicialização por etapa
+  5. Detecta o codec de cada câmera (iot_devices.yml, perfil ONVIF ou
+     ffprobe): compatíveis com o browser seguem em relay -c copy; as demais
+     ocupam um pool limitado de transcodificação para H.264
+  6. Re-testa as câmeras periodicamente: mortas saem do mediamtx.yml com
+     backoff, e voltam quando respondem (MediaMTX recarrega o arquivo)
+  7. Monitora o MediaMTX e reinicia se cair
 """
 
+import asyncio
+import hashlib
 import http.server
 import json
 import os
+import random
+import re
 import signal
 import socket
+import ssl
 import subprocess
 import sys
 import threading
 import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import requests
@@ -41,6 +56,7 @@ CONFIG_FILE = BASE_DIR / "iot_devices.yml"
 BASE_CONFIG = BASE_DIR / "mediamtx.base.yml"
 FINAL_CONFIG = BASE_DIR / "mediamtx.yml"
 MEDIAMTX_BIN = BASE_DIR / "mediamtx"
+SYNC_STATE   = BASE_DIR / ".device_sync.json"
 
 RELAY_SERVER = os.environ.get("RELAY_SERVER", "")
 API_KEY      = os.environ.get("API_KEY", "")
@@ -48,6 +64,41 @@ API_KEY      = os.environ.get("API_KEY", "")
 BACKEND_URL  = f"http://{RELAY_SERVER}:3000"
 PTZ_PORT     = 9000
 
+# Sincronização de dispositivos: só estes campos vão ao backend (sem URL/credenciais)
+SYNC_VERSION = 1
+SYNC_FIELDS  = ("name", "type")
+
+# URL WebRTC anunciada aos clientes da LAN. Precisa ser https (proxy local com
+# certificado): o dashboard roda em https e o browser bloqueia WHEP em http
+# como conteúdo misto. Vazio = não anuncia; o playback usa o servidor central.
+LOCAL_WEBRTC_URL = os.environ.get("LOCAL_WEBRTC_URL", "")
+
+IOT_POLL_INTERVAL   = int(os.environ.get("IOT_POLL_INTERVAL", "10"))
+IOT_REPORT_INTERVAL = int(os.environ.get("IOT_REPORT_INTERVAL", "2"))
+IOT_REPORT_BATCH    = 200
+IOT_CONCURRENCY     = 32
+IOT_TIMEOUT         = 3
+
+RTSP_PROBE_INTERVAL = int(os.environ.get("RTSP_PROBE_INTERVAL", "30"))
+RTSP_PROBE_TIMEOUT  = 2
+RTSP_BACKOFF_MAX    = 600
+RTSP_PARK_AFTER     = 3  # falhas seguidas para estacionar uma câmera ativa
+# Esquema → porta padrão das fontes testadas; demais (rtmp, http, udp...) são sempre admitidas
+RTSP_PROBE_PORTS    = {"rtsp": 554, "rtsps": 322}
+
+# Codecs reproduzíveis via WebRTC na maioria dos browsers (relay -c copy)
+BROWSER_CODECS = {"h264", "vp8", "vp9", "av1"}
+# Grafias aceitas (YAML, Encoding ONVIF) → nome de codec do ffmpeg
+CODEC_ALIASES  = {"avc": "h264", "h265": "hevc", "jpeg": "mjpeg", "mp4v": "mpeg4"}
+CODEC_PROBE_WORKERS = 2  # ffprobes simultâneos na detecção de codec
+
+# Pool de transcodificação: no máximo TRANSCODE_MAX streams, dividindo
+# TRANSCODE_CPU_BUDGET núcleos entre elas (-threads do ffmpeg)
+TRANSCODE_MAX        = int(os.environ.get("TRANSCODE_MAX", "2"))
+TRANSCODE_CPU_BUDGET = int(os.environ.get(
+    "TRANSCODE_CPU_BUDGET", str(max(1, (os.cpu_count() or 2) // 2))
+))
+
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 
 def log(msg):
@@ -74,11 +125,14 @@ def get_local_ip():
 
 # ─── Backend ──────────────────────────────────────────────────────────────────
 
-def authenticate(local_api_url=None):
+def authenticate(local_api_url=None, local_webrtc_url=None, local_paths=None):
     log("Autenticando no backend...")
     body = {"api_key": API_KEY}
     if local_api_url:
         body["local_api_url"] = local_api_url
+    if local_webrtc_url:
+        body["local_webrtc_url"]   = local_webrtc_url
+        body["local_webrtc_paths"] = local_paths or []
 
     try:
         resp = requests.post(
@@ -97,22 +151,100 @@ def authenticate(local_api_url=None):
     return data["name"]
 
 
+def device_digests(devices):
+    """{"TIPO:nome": (campos sincronizados, hash do conteúdo)} por dispositivo."""
+    digests = {}
+    for device in devices:
+        if not device.get("name") or not device.get("type"):
+            continue
+        fields = {f: device.get(f) for f in SYNC_FIELDS}
+        digest = hashlib.sha256(json.dumps(fields, sort_keys=True).encode()).hexdigest()
+        digests[f"{device['type']}:{device['name']}"] = (fields, digest)
+    return digests
+
+
+def device_set_hash(digests):
+    joined = "\n".join(f"{key}={digest}" for key, (_, digest) in sorted(digests.items()))
+    return hashlib.sha256(joined.encode()).hexdigest()
+
+
+def load_sync_state():
+    try:
+        with open(SYNC_STATE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_sync_state(set_hash, digests):
+    state = {
+        "hash":    set_hash,
+        "devices": {key: digest for key, (_, digest) in digests.items()},
+    }
+    with open(SYNC_STATE, "w") as f:
+        json.dump(state, f)
+
+
+def post_device_sync(body):
+    resp = requests.post(
+        f"{BACKEND_URL}/api/iot-devices/sync",
+        json={"api_key": API_KEY, "version": SYNC_VERSION, **body},
+        timeout=10,
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
 def register_devices(devices):
-    log("Registrando dispositivos IoT no backend...")
+    """
+    Sincroniza os dispositivos com o backend por hash: se o backend já tem o
+    mesmo conjunto responde "unchanged"; senão aplica só o delta desde o
+    último sync, ou pede "resync" e recebe o conjunto completo.
+    """
+    log("Sincronizando dispositivos IoT com o backend...")
+    digests  = device_digests(devices)
+    set_hash = device_set_hash(digests)
+    previous = load_sync_state()
+
+    body = {"hash": set_hash}
+    if previous.get("hash"):
+        body["base_hash"] = previous["hash"]
+    if previous.get("hash") and previous["hash"] != set_hash:
+        old = previous.get("devices", {})
+        body["added"]   = [f for k, (f, _) in digests.items() if k not in old]
+        body["removed"] = [
+            dict(zip(("type", "name"), key.split(":", 1)))
+            for key in old if key not in digests
+        ]
+
     try:
-        resp = requests.post(
-            f"{BACKEND_URL}/api/iot-devices/register",
-            json={"api_key": API_KEY, "devices": devices},
-            timeout=10,
-        )
-        result = resp.json()
-        log(f"Registro: {json.dumps(result, ensure_ascii=False)}")
+        result = post_device_sync(body)
+        if result.get("status") == "resync":
+            log("Backend pediu sincronização completa")
+            result = post_device_sync({
+                "hash":    set_hash,
+                "devices": [f for f, _ in digests.values()],
+            })
+        if result.get("status") in ("unchanged", "synced"):
+            save_sync_state(set_hash, digests)
+        log(f"Sincronização: {json.dumps(result, ensure_ascii=False)}")
         return result
     except Exception as e:
-        log(f"Aviso: falha ao registrar dispositivos — {e}")
+        log(f"Aviso: falha ao sincronizar dispositivos — {e}")
         return {}
 
 
+def report_iot_states(states):
+    """Envia ao backend um lote de mudanças de estado de dispositivos IoT."""
+    resp = requests.post(
+        f"{BACKEND_URL}/api/iot-devices/state",
+        json={"api_key": API_KEY, "states": states},
+        timeout=10,
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
 # ─── ONVIF PTZ ────────────────────────────────────────────────────────────────
 
 def build_onvif_cameras(devices):
@@ -148,8 +280,10 @@ def build_onvif_cameras(devices):
             media    = cam.create_media_service()
             profiles = media.GetProfiles()
             token    = profiles[0].token
+            encoder  = getattr(profiles[0], "VideoEncoderConfiguration", None)
+            codec    = normalize_codec(getattr(encoder, "Encoding", None))
 
-            cameras[name] = {"ptz": ptz, "token": token}
+            cameras[name] = {"ptz": ptz, "token": token, "codec": codec}
             log(f"ONVIF PTZ configurado: {name} ({host}:{onvif_port})")
         except Exception as e:
             log(f"Aviso: falha ao configurar ONVIF para {name}: {e}")
@@ -247,9 +381,198 @@ def start_ptz_server(onvif_cameras):
     return server
 
 
+# ─── Dispositivos IoT ─────────────────────────────────────────────────────────
+
+async def _http_json(method, url, body=None, timeout=IOT_TIMEOUT):
+    """Requisição HTTP/1.0 mínima sobre asyncio, suficiente para o JSON curto dos dispositivos."""
+    parsed  = urllib.parse.urlparse(url)
+    host    = parsed.hostname
+    port    = parsed.port or 80
+    path    = (parsed.path or "/") + (f"?{parsed.query}" if parsed.query else "")
+    payload = json.dumps(body).encode() if body is not None else b""
+    request = (
+        f"{method} {path} HTTP/1.0\r\n"
+        f"Host: {host}:{port}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: close\r\n\r\n"
+    ).encode() + payload
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(request)
+            await writer.drain()
+            return await reader.read()
+        finally:
+            writer.close()
+
+    raw = await asyncio.wait_for(exchange(), timeout)
+    head, _, content = raw.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    if status != 200:
+        raise RuntimeError(f"HTTP {status}")
+    return json.loads(content or b"null")
+
+
+async def _poll_sonoff_mini(device):
+    """Sonoff Mini em modo DIY: POST /zeroconf/info na porta 8081."""
+    port = device.get("port", 8081)
+    data = await _http_json(
+        "POST",
+        f"http://{device['host']}:{port}/zeroconf/info",
+        {"deviceid": device.get("deviceid", ""), "data": {}},
+    )
+    info = data.get("data") or {}
+    if isinstance(info, str):  # firmwares 3.x devolvem "data" como string JSON
+        info = json.loads(info)
+    return {"switch": info.get("switch")}
+
+
+async def _poll_sensor_presenca(device):
+    """Sensor de presença com endpoint HTTP próprio que devolve JSON."""
+    data = await _http_json("GET", device["url"])
+    return {"presence": bool(data.get(device.get("field", "presence")))}
+
+
+# tipo → (campo obrigatório no iot_devices.yml, coroutine de leitura)
+IOT_DRIVERS = {
+    "SONOFF_MINI":     ("host", _poll_sonoff_mini),
+    "SENSOR_PRESENCA": ("url",  _poll_sensor_presenca),
+}
+
+
+class IotPoller:
+    """
+    Lê o estado dos dispositivos IoT em um único event loop asyncio.
+
+    Cada dispositivo tem seu próprio intervalo (campo `interval`, padrão
+    IOT_POLL_INTERVAL). O último estado conhecido fica em cache e só as
+    mudanças são enviadas ao backend, agrupadas em lotes a cada
+    IOT_REPORT_INTERVAL segundos.
+    """
+
+    def __init__(self, devices):
+        self.devices = devices
+        self.state   = {}  # name → último estado conhecido
+        self.pending = {}  # name → mudança ainda não reportada
+
+    def start(self):
+        t = threading.Thread(target=asyncio.run, args=(self._run(),), daemon=True)
+        t.start()
+        return t
+
+    async def _run(self):
+        sem   = asyncio.Semaphore(IOT_CONCURRENCY)
+        tasks = [self._poll_loop(device, sem) for device in self.devices]
+        await asyncio.gather(self._report_loop(), *tasks)
+
+    async def _poll_loop(self, device, sem):
+        name     = device["name"]
+        interval = device.get("interval", IOT_POLL_INTERVAL)
+        _, read  = IOT_DRIVERS[device["type"]]
+
+        # espalha as primeiras leituras para não disparar tudo no mesmo instante
+        await asyncio.sleep(random.uniform(0, interval))
+        while True:
+            async with sem:
+                try:
+                    state = {"online": True, **await read(device)}
+                except Exception:
+                    state = {"online": False}
+
+            if self.state.get(name) != state:
+                self.state[name]   = state
+                self.pending[name] = {
+                    "name":  name,
+                    "type":  device["type"],
+                    "state": state,
+                    "ts":    int(time.time()),
+                }
+            await asyncio.sleep(interval)
+
+    async def _report_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(IOT_REPORT_INTERVAL)
+            if not self.pending:
+                continue
+
+            names = list(self.pending)[:IOT_REPORT_BATCH]
+            batch = {n: self.pending.pop(n) for n in names}
+            try:
+                result = await loop.run_in_executor(None, report_iot_states, list(batch.values()))
+                if result.get("updated", len(batch)) < len(batch):
+                    # backend ainda sem o dispositivo (sync pendente ou falho):
+                    # esquece o cache para a próxima leitura reportar de novo
+                    for n in batch:
+                        self.state.pop(n, None)
+            except Exception as e:
+                log(f"Aviso: falha ao reportar estado IoT — {e}")
+                # devolve ao lote, sem sobrescrever mudanças mais novas
+                for n, change in batch.items():
+                    self.pending.setdefault(n, change)
+
+
+def start_iot_poller(devices):
+    """Sobe o IotPoller para os dispositivos com driver e configuração de acesso."""
+    pollable = []
+    for device in devices:
+        driver = IOT_DRIVERS.get(device.get("type"))
+        if driver is None:
+            continue
+        field, _ = driver
+        if not device.get("name") or not device.get(field):
+            log(f"Aviso: {device.get('type')} '{device.get('name', '')}' sem {field} — sem polling")
+            continue
+        pollable.append(device)
+
+    if not pollable:
+        return None
+
+    poller = IotPoller(pollable)
+    poller.start()
+    log(f"Polling IoT iniciado ({len(pollable)} dispositivo(s))")
+    return poller
+
+
 # ─── Configuração MediaMTX ────────────────────────────────────────────────────
 
-def build_mediamtx_config(devices):
+def camera_paths(devices):
+    """Paths MediaMTX servidos localmente (um por CAMERA com name e url)."""
+    return [
+        d["name"] for d in devices
+        if d.get("type") == "CAMERA" and d.get("name") and d.get("url")
+    ]
+
+
+def relay_command(name, transcode_threads=0):
+    """ffmpeg de relay para o servidor central: cópia, ou H.264 com N threads."""
+    if transcode_threads:
+        # -threads antes do -i limita também o decoder, não só o encoder
+        prefix = f"nice -n 10 ffmpeg -threads {transcode_threads}"
+        codec  = (
+            f"-c copy -c:v libx264 -preset ultrafast -tune zerolatency "
+            f"-pix_fmt yuv420p -threads {transcode_threads}"
+        )
+    else:
+        prefix = "ffmpeg"
+        codec  = "-c copy"
+
+    return (
+        f"{prefix} -analyzeduration 5000000 -probesize 5000000 "
+        f"-rtsp_transport tcp -i rtsp://localhost:8554/{name} "
+        f"-map 0 {codec} -f rtsp -rtsp_transport tcp "
+        f"rtsp://gateway:{API_KEY}@{RELAY_SERVER}:8554/{name}"
+    )
+
+
+def build_mediamtx_config(devices, parked=(), transcode=None):
+    """
+    Gera mediamtx.yml. Câmeras em `parked` ficam fora até voltarem a
+    responder; `transcode` é {nome: threads} das que saem em H.264.
+    """
+    transcode = transcode or {}
     if not BASE_CONFIG.exists():
         die(f"Config base não encontrada: {BASE_CONFIG}")
 
@@ -270,18 +593,18 @@ def build_mediamtx_config(devices):
             log(f"Aviso: dispositivo CAMERA sem name ou url — ignorado")
             continue
 
-        log(f"Configurando câmera: {name} ({url})")
+        if name in parked:
+            log(f"Câmera estacionada (sem resposta RTSP): {name}")
+            continue
+
+        mode = " [transcodificando]" if name in transcode else ""
+        log(f"Configurando câmera: {name} ({url}){mode}")
         camera_count += 1
 
         paths[name] = {
             "source": url,
             "sourceOnDemand": False,
-            "runOnReady": (
-                f"ffmpeg -analyzeduration 5000000 -probesize 5000000 "
-                f"-rtsp_transport tcp -i rtsp://localhost:8554/{name} "
-                f"-map 0 -c copy -f rtsp -rtsp_transport tcp "
-                f"rtsp://gateway:{API_KEY}@{RELAY_SERVER}:8554/{name}"
-            ),
+            "runOnReady": relay_command(name, transcode.get(name, 0)),
             "runOnReadyRestart": True,
         }
 
@@ -291,12 +614,242 @@ def build_mediamtx_config(devices):
     paths["all_others"] = {}
     config["paths"] = paths
 
-    with open(FINAL_CONFIG, "w") as f:
+    # escrita atômica: o MediaMTX recarrega o arquivo quando ele muda
+    tmp = FINAL_CONFIG.with_suffix(".yml.tmp")
+    with open(tmp, "w") as f:
         yaml.dump(config, f, default_flow_style=False, allow_unicode=True)
+    os.replace(tmp, FINAL_CONFIG)
 
     log(f"mediamtx.yml gerado ({camera_count} câmera(s))")
 
 
+# ─── Codecs ───────────────────────────────────────────────────────────────────
+
+def normalize_codec(value):
+    """Nome de codec do ffmpeg para grafias como "H.264", "H265" ou "JPEG"."""
+    if not value:
+        return None
+    codec = re.sub(r"[^a-z0-9]", "", str(value).lower())
+    return CODEC_ALIASES.get(codec, codec) or None
+
+
+def probe_codec(name, timeout=15):
+    """
+    Codec do primeiro stream de vídeo do path local do MediaMTX, via ffprobe
+    (None se indisponível). Lê do MediaMTX para não abrir outra sessão na
+    câmera; repete enquanto o path ainda não tem stream, até `timeout`.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            out = subprocess.run(
+                [
+                    "ffprobe", "-v", "error", "-rtsp_transport", "tcp",
+                    "-select_streams", "v:0",
+                    "-show_entries", "stream=codec_name",
+                    "-of", "csv=p=0", f"rtsp://localhost:8554/{name}",
+                ],
+                capture_output=True, text=True,
+                timeout=max(1, deadline - time.monotonic()),
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        codec = normalize_codec(out.stdout.strip())
+        if codec or time.monotonic() + 1 >= deadline:
+            return codec
+        time.sleep(1)
+
+
+def detect_codecs(names, onvif_cameras):
+    """
+    Codec de cada câmera: perfil ONVIF quando disponível, senão ffprobe no
+    path local (no máximo CODEC_PROBE_WORKERS em paralelo).
+    """
+    codecs = {}
+    pending = []
+    for name in names:
+        codec = (onvif_cameras.get(name) or {}).get("codec")
+        if codec:
+            codecs[name] = codec
+        else:
+            pending.append(name)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(CODEC_PROBE_WORKERS, len(pending))) as pool:
+            codecs.update(zip(pending, pool.map(probe_codec, pending)))
+
+    for name, codec in codecs.items():
+        log(f"Codec de {name}: {codec or 'desconhecido'}")
+    return codecs
+
+
+def assign_transcoding(codecs):
+    """
+    Distribui o pool de transcodificação entre as câmeras com codec
+    incompatível: {nome: threads}. Codec desconhecido segue em cópia.
+    """
+    incompatible = sorted(
+        name for name, codec in codecs.items()
+        if codec and codec not in BROWSER_CODECS
+    )
+    slots    = min(TRANSCODE_MAX, TRANSCODE_CPU_BUDGET)  # ao menos 1 thread por stream
+    selected = incompatible[:slots]
+    for name in incompatible[slots:]:
+        log(f"Aviso: pool de transcodificação cheio — {name} ({codecs[name]}) segue sem transcodificar")
+
+    if not selected:
+        return {}
+    threads = max(1, TRANSCODE_CPU_BUDGET // len(selected))
+    return {name: threads for name in selected}
+
+
+# ─── Liveness RTSP ────────────────────────────────────────────────────────────
+
+async def probe_rtsp(url, timeout=RTSP_PROBE_TIMEOUT):
+    """
+    True se a câmera responde a um RTSP OPTIONS (qualquer status RTSP).
+    rtsps:// é testado sobre TLS; fontes não RTSP são sempre admitidas.
+    """
+    parsed = urllib.parse.urlparse(url)
+    scheme = parsed.scheme.lower()
+    if scheme not in RTSP_PROBE_PORTS:
+        return True
+    host   = parsed.hostname
+    port   = parsed.port or RTSP_PROBE_PORTS[scheme]
+    target = f"{scheme}://{host}:{port}{parsed.path or '/'}"  # sem credenciais
+    tls    = None
+    if scheme == "rtsps":
+        # câmeras costumam usar certificado autoassinado: só testa a resposta
+        tls = ssl.create_default_context()
+        tls.check_hostname = False
+        tls.verify_mode    = ssl.CERT_NONE
+    request = (
+        f"OPTIONS {target} RTSP/1.0\r\n"
+        f"CSeq: 1\r\n"
+        f"User-Agent: smartmesh-gateway\r\n\r\n"
+    ).encode()
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(host, port, ssl=tls)
+        try:
+            writer.write(request)
+            await writer.drain()
+            return await reader.readline()
+        finally:
+            writer.close()
+
+    try:
+        status = await asyncio.wait_for(exchange(), timeout)
+        return status.startswith(b"RTSP/1.0")
+    except Exception:
+        return False
+
+
+class CameraSupervisor:
+    """
+    Admissão das câmeras no MediaMTX conforme respondem RTSP.
+
+    Câmeras que não respondem ficam estacionadas (fora do mediamtx.yml),
+    sendo re-testadas com backoff exponencial até RTSP_BACKOFF_MAX; ao
+    responder, voltam ao arquivo. Câmeras ativas são estacionadas após
+    RTSP_PARK_AFTER falhas seguidas.
+    """
+
+    def __init__(self, devices):
+        self.devices  = devices
+        self.cameras  = {
+            d["name"]: d["url"] for d in devices
+            if d.get("type") == "CAMERA" and d.get("name") and d.get("url")
+        }
+        self.parked   = {}  # name → {"failures", "next_probe"}
+        self.failures = {}  # name → falhas seguidas de câmera ativa
+        self.onvif    = {}  # câmeras ONVIF, preenchido em detect_codecs
+        self.codecs   = {
+            d["name"]: normalize_codec(d["codec"]) for d in devices
+            if d.get("name") in self.cameras and d.get("codec")
+        }
+
+    def write_config(self):
+        """Regrava mediamtx.yml com as câmeras ativas e o pool de transcodificação."""
+        active = {n: c for n, c in self.codecs.items() if n not in self.parked}
+        build_mediamtx_config(self.devices, set(self.parked), assign_transcoding(active))
+
+    def detect_codecs(self, onvif_cameras):
+        """Detecta o codec das câmeras ativas ainda sem codec e regrava a config."""
+        self.onvif = onvif_cameras
+        unknown = [
+            n for n in self.cameras
+            if n not in self.codecs and n not in self.parked
+        ]
+        self.codecs.update(detect_codecs(unknown, onvif_cameras))
+        self.write_config()
+
+    def initial_probe(self):
+        """Testa todas as câmeras em paralelo; retorna os nomes estacionados."""
+        results = asyncio.run(self._probe(self.cameras))
+        for name, alive in results.items():
+            if not alive:
+                self._park(name)
+        return set(self.parked)
+
+    def start(self):
+        t = threading.Thread(target=asyncio.run, args=(self._run(),), daemon=True)
+        t.start()
+        return t
+
+    async def _probe(self, cameras):
+        names   = list(cameras)
+        results = await asyncio.gather(*(probe_rtsp(cameras[n]) for n in names))
+        return dict(zip(names, results))
+
+    def _park(self, name):
+        failures = self.parked.get(name, {}).get("failures", 0) + 1
+        delay    = min(RTSP_PROBE_INTERVAL * 2 ** (failures - 1), RTSP_BACKOFF_MAX)
+        self.parked[name] = {"failures": failures, "next_probe": time.monotonic() + delay}
+        self.failures.pop(name, None)
+        log(f"Câmera {name} sem resposta RTSP — novo teste em {delay}s")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(RTSP_PROBE_INTERVAL)
+            now = time.monotonic()
+            due = {
+                name: url for name, url in self.cameras.items()
+                if name not in self.parked or self.parked[name]["next_probe"] <= now
+            }
+            changed    = False
+            readmitted = []
+            for name, alive in (await self._probe(due)).items():
+                if name in self.parked:
+                    if alive:
+                        del self.parked[name]
+                        log(f"Câmera {name} voltou a responder — readmitida")
+                        if name not in self.codecs:
+                            readmitted.append(name)
+                        changed = True
+                    else:
+                        self._park(name)
+                elif alive:
+                    self.failures.pop(name, None)
+                else:
+                    self.failures[name] = self.failures.get(name, 0) + 1
+                    if self.failures[name] >= RTSP_PARK_AFTER:
+                        self._park(name)
+                        changed = True
+
+            if changed:
+                self.write_config()
+
+            if readmitted:
+                # o codec só pode ser lido depois que o path voltou ao MediaMTX
+                found = await asyncio.get_running_loop().run_in_executor(
+                    None, detect_codecs, readmitted, self.onvif
+                )
+                self.codecs.update(found)
+                if assign_transcoding(found):
+                    self.write_config()
+
+
 # ─── MediaMTX ─────────────────────────────────────────────────────────────────
 
 mediamtx_proc = None
@@ -322,10 +875,49 @@ def monitor_mediamtx(proc):
         proc = start_mediamtx()
 
 
+# ─── Inicialização ────────────────────────────────────────────────────────────
+
+def run_startup_pipeline(stages):
+    """
+    Executa as etapas de inicialização em paralelo, respeitando dependências.
+
+    `stages` é {nome: (função, [dependências])}, declarado em ordem
+    topológica; cada função recebe os resultados das dependências como
+    argumentos. Retorna (resultados, tempos), com tempos = {nome: (início,
+    fim)} em segundos desde o começo do pipeline.
+    """
+    boot    = time.monotonic()
+    futures = {}
+    timings = {}
+
+    def run(name, fn, deps):
+        args  = [futures[d].result() for d in deps]
+        start = time.monotonic()
+        try:
+            return fn(*args)
+        finally:
+            timings[name] = (start - boot, time.monotonic() - boot)
+
+    # um worker por etapa: esperar dependências nunca bloqueia outra etapa
+    with ThreadPoolExecutor(max_workers=len(stages)) as pool:
+        for name, (fn, deps) in stages.items():
+            futures[name] = pool.submit(run, name, fn, deps)
+        results = {name: f.result() for name, f in futures.items()}
+
+    return results, timings
+
+
+def log_startup_report(timings):
+    log("Tempo de inicialização por etapa:")
+    for name, (start, end) in sorted(timings.items(), key=lambda t: t[1]):
+        log(f"  {name:<18} {start:6.2f}s → {end:6.2f}s  ({end - start:.2f}s)")
+    total = max(end for _, end in timings.values())
+    log(f"  {'total':<18} {total:6.2f}s")
+
+
 # ─── Shutdown ─────────────────────────────────────────────────────────────────
 
-def shutdown(sig, frame):
-    log("Sinal de encerramento recebido.")
+def stop_mediamtx():
     if mediamtx_proc and mediamtx_proc.poll() is None:
         log("Encerrando MediaMTX...")
         mediamtx_proc.terminate()
@@ -333,6 +925,11 @@ def shutdown(sig, frame):
             mediamtx_proc.wait(timeout=5)
         except subprocess.TimeoutExpired:
             mediamtx_proc.kill()
+
+
+def shutdown(sig, frame):
+    log("Sinal de encerramento recebido.")
+    stop_mediamtx()
     sys.exit(0)
 
 
@@ -358,27 +955,46 @@ def main():
     devices = raw.get("devices", [])
     log(f"{len(devices)} dispositivo(s) em {CONFIG_FILE}")
 
-    # Detecta IP local e monta URL da API PTZ
-    local_ip      = get_local_ip()
-    local_api_url = f"http://{local_ip}:{PTZ_PORT}"
-
-    # Fluxo principal
-    authenticate(local_api_url=local_api_url)
-    register_devices(devices)
-    build_mediamtx_config(devices)
-
-    # Inicia API PTZ (daemon thread)
-    onvif_cameras = build_onvif_cameras(devices)
-    start_ptz_server(onvif_cameras)
-    log(f"PTZ API em {local_api_url}")
-
     # Signals
     signal.signal(signal.SIGINT, shutdown)
     signal.signal(signal.SIGTERM, shutdown)
 
-    # Inicia e monitora MediaMTX
-    proc = start_mediamtx()
-    monitor_mediamtx(proc)
+    # API PTZ sobe já; o mapa de câmeras é preenchido quando o ONVIF responder
+    onvif_cameras = {}
+    start_ptz_server(onvif_cameras)
+
+    # MediaMTX e vídeo local primeiro; backend, ONVIF e IoT em paralelo
+    supervisor = CameraSupervisor(devices)
+    stages = {
+        "rtsp_probe":       (supervisor.initial_probe, []),
+        "mediamtx_config":  (lambda _: supervisor.write_config(), ["rtsp_probe"]),
+        "mediamtx":         (lambda _: start_mediamtx(), ["mediamtx_config"]),
+        "local_ip":         (get_local_ip, []),
+        "authenticate":     (lambda ip: authenticate(
+                                 f"http://{ip}:{PTZ_PORT}",
+                                 LOCAL_WEBRTC_URL or None,
+                                 camera_paths(devices),
+                             ), ["local_ip"]),
+        "register_devices": (lambda: register_devices(devices), []),
+        "onvif":            (lambda: onvif_cameras.update(build_onvif_cameras(devices)), []),
+        "iot_poller":       (lambda _: start_iot_poller(devices), ["register_devices"]),
+        "codecs":           (lambda *_: supervisor.detect_codecs(onvif_cameras),
+                             ["onvif", "mediamtx"]),
+    }
+    try:
+        results, timings = run_startup_pipeline(stages)
+    except SystemExit:
+        stop_mediamtx()
+        raise
+
+    log(f"PTZ API em http://{results['local_ip']}:{PTZ_PORT}")
+    log_startup_report(timings)
+
+    # Re-teste periódico das câmeras (daemon thread com event loop próprio)
+    supervisor.start()
+
+    # Monitora MediaMTX
+    monitor_mediamtx(results["mediamtx"])
 
 
 if __name__ == "__main__":
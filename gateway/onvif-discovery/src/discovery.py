@@ -3,20 +3,33 @@ ONVIF Camera Discovery Service
 
 Descobre câmeras ONVIF na rede local e registra seus streams RTSP no MediaMTX.
 Suporta dois modos:
-  1. WS-Discovery (multicast) — funciona em redes com suporte a multicast
+  1. WS-Discovery (multicast) — funciona em redes com suporte a multicast.
+     Um listener permanente reage a Hello/Bye das câmeras em tempo real;
+     probes ativos (em todas as interfaces) ficam como fallback esparso.
   2. Scan por range de IPs — fallback para ambientes como WSL2/Docker
+
+Cada ciclo emite spans de tempo por etapa e por host como linhas JSON
+(logger "discovery.trace") e agrega métricas Prometheus em /metrics.
+Com DISCOVERY_PROFILE=1, o fim de cada ciclo loga os hosts e etapas mais lentos.
 """
 
+import http.server
+import json
 import logging
 import os
+import queue
 import re
 import socket
+import sys
+import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from urllib.parse import urlparse
 
 import requests
 from onvif import ONVIFCamera
+from zeep.exceptions import Fault
 
 logging.basicConfig(
     level=logging.INFO,
@@ -26,17 +39,282 @@ logger = logging.getLogger(__name__)
 
 ONVIF_USER = os.environ.get("ONVIF_USER", "admin")
 ONVIF_PASSWORD = os.environ.get("ONVIF_PASSWORD", "")
+
+# Credenciais tentadas em ordem (ex: "admin:senha1,admin:senha2,root:pass").
+# Sem ONVIF_CREDENTIALS, usa apenas ONVIF_USER/ONVIF_PASSWORD.
+ONVIF_CREDENTIALS = [
+    tuple(entry.split(":", 1))
+    for entry in os.environ.get("ONVIF_CREDENTIALS", "").split(",")
+    if ":" in entry
+] or [(ONVIF_USER, ONVIF_PASSWORD)]
 MEDIAMTX_API = os.environ.get("MEDIAMTX_API", "http://127.0.0.1:9997")
 DISCOVERY_INTERVAL = int(os.environ.get("DISCOVERY_INTERVAL", "60"))
 
+# Probe WS-Discovery ativo (fallback do listener passivo)
+WSD_PROBE_INTERVAL = int(os.environ.get("WSD_PROBE_INTERVAL", "600"))
+WSD_PROBE_TIMEOUT = int(os.environ.get("WSD_PROBE_TIMEOUT", "5"))
+
 # Range de IPs para scan (ex: "192.168.15.1-254")
 SCAN_RANGE = os.environ.get("SCAN_RANGE", "")
 
+SCAN_WORKERS = int(os.environ.get("SCAN_WORKERS", "50"))
+
+# Backoff exponencial para hosts com porta aberta que não são ONVIF ou
+# rejeitam todas as credenciais: BASE, 2×BASE, 4×BASE... até MAX segundos
+NEGATIVE_BACKOFF_BASE = int(os.environ.get("NEGATIVE_BACKOFF_BASE", "120"))
+NEGATIVE_BACKOFF_MAX = int(os.environ.get("NEGATIVE_BACKOFF_MAX", "3600"))
+
 # Portas ONVIF comuns
 ONVIF_PORTS = [80, 8080, 8899, 2020]
 
+# Códigos de SOAP fault (nome local) que indicam credencial recusada
+AUTH_FAULT_CODES = {"NotAuthorized", "SenderNotAuthorized", "FailedAuthentication"}
+
+# Tracing: destino das linhas JSON ("" = stdout), porta das métricas (0 = desliga)
+TRACE_FILE = os.environ.get("TRACE_FILE", "")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9108"))
+DISCOVERY_PROFILE = os.environ.get("DISCOVERY_PROFILE", "") in ("1", "true", "yes")
+PROFILE_TOP = int(os.environ.get("PROFILE_TOP", "10"))
+
+trace_logger = logging.getLogger("discovery.trace")
+trace_logger.propagate = False
+trace_logger.addHandler(
+    logging.FileHandler(TRACE_FILE) if TRACE_FILE
+    else logging.StreamHandler(sys.stdout)
+)
+
 registered_cameras = set()
 
+# host → câmera descoberta (Hello, probe ou scan) ainda não registrada;
+# re-tentada a cada ciclo periódico, independente do probe multicast
+pending_cameras = {}
+
+# Eventos do listener WS-Discovery: ("hello", [câmeras]) ou ("bye", [hosts])
+ws_events = queue.Queue()
+
+# EPR (endpoint reference) → hosts anunciados, para resolver mensagens Bye
+ws_services = {}
+
+# (host, porta) → {"failures", "reason", "until"}: hosts em backoff
+negative_cache = {}
+
+# host → (usuário, senha) que funcionou por último
+host_credentials = {}
+
+# Estado do tracing: ciclo atual, spans do ciclo e agregados por etapa
+trace_lock = threading.Lock()
+trace_cycle = 0
+cycle_spans = []
+stage_metrics = {}  # etapa → {"count", "errors", "sum", "max"}
+cycle_metrics = {"total": 0, "last_seconds": 0.0}
+
+
+@contextmanager
+def span(stage, host=None, **fields):
+    """
+    Mede a duração de uma etapa e emite o span como linha JSON.
+    O dict retornado aceita campos extras (ex: status) durante a etapa.
+    """
+    fields["status"] = "ok"
+    start = time.monotonic()
+    try:
+        yield fields
+    except Exception:
+        fields["status"] = "error"
+        raise
+    finally:
+        duration = time.monotonic() - start
+        record = {
+            "ts": round(time.time(), 3),
+            "cycle": trace_cycle,
+            "stage": stage,
+            "host": host,
+            "duration_ms": round(duration * 1000, 1),
+            **fields,
+        }
+        with trace_lock:
+            cycle_spans.append(record)
+            m = stage_metrics.setdefault(
+                stage, {"count": 0, "errors": 0, "sum": 0.0, "max": 0.0}
+            )
+            m["count"] += 1
+            m["sum"] += duration
+            m["max"] = max(m["max"], duration)
+            if fields["status"] != "ok":
+                m["errors"] += 1
+        trace_logger.info(json.dumps(record, default=str))
+
+
+def start_cycle():
+    global trace_cycle
+    with trace_lock:
+        trace_cycle += 1
+        cycle_spans.clear()
+
+
+def end_cycle(duration):
+    with trace_lock:
+        cycle_metrics["total"] += 1
+        cycle_metrics["last_seconds"] = duration
+        spans = list(cycle_spans)
+    if DISCOVERY_PROFILE:
+        log_cycle_profile(spans)
+
+
+def log_cycle_profile(spans):
+    """Loga as etapas e os hosts mais lentos do ciclo (modo profiling)."""
+    stages = {}
+    for sp in spans:
+        total, count = stages.get(sp["stage"], (0.0, 0))
+        stages[sp["stage"]] = (total + sp["duration_ms"], count + 1)
+
+    logger.info("Perfil do ciclo %d — etapas mais lentas:", trace_cycle)
+    ranked = sorted(stages.items(), key=lambda s: s[1][0], reverse=True)
+    for stage, (total, count) in ranked[:PROFILE_TOP]:
+        logger.info("  %-20s %10.1f ms  (%d spans)", stage, total, count)
+
+    host_spans = [sp for sp in spans if sp["host"]]
+    host_spans.sort(key=lambda sp: sp["duration_ms"], reverse=True)
+    logger.info("Perfil do ciclo %d — hosts mais lentos:", trace_cycle)
+    for sp in host_spans[:PROFILE_TOP]:
+        where = f'{sp["host"]}:{sp["port"]}' if sp.get("port") else sp["host"]
+        logger.info(
+            "  %-22s %-18s %10.1f ms  %s",
+            where, sp["stage"], sp["duration_ms"], sp["status"],
+        )
+
+
+def render_metrics():
+    """Métricas agregadas no formato texto do Prometheus."""
+    lines = [
+        "# TYPE discovery_stage_duration_seconds summary",
+    ]
+    with trace_lock:
+        for stage, m in sorted(stage_metrics.items()):
+            lines.append(f'discovery_stage_duration_seconds_sum{{stage="{stage}"}} {m["sum"]:.6f}')
+            lines.append(f'discovery_stage_duration_seconds_count{{stage="{stage}"}} {m["count"]}')
+        lines.append("# TYPE discovery_stage_duration_seconds_max gauge")
+        for stage, m in sorted(stage_metrics.items()):
+            lines.append(f'discovery_stage_duration_seconds_max{{stage="{stage}"}} {m["max"]:.6f}')
+        lines.append("# TYPE discovery_stage_errors_total counter")
+        for stage, m in sorted(stage_metrics.items()):
+            lines.append(f'discovery_stage_errors_total{{stage="{stage}"}} {m["errors"]}')
+        lines += [
+            "# TYPE discovery_cycles_total counter",
+            f'discovery_cycles_total {cycle_metrics["total"]}',
+            "# TYPE discovery_last_cycle_seconds gauge",
+            f'discovery_last_cycle_seconds {cycle_metrics["last_seconds"]:.6f}',
+            "# TYPE discovery_registered_cameras gauge",
+            f"discovery_registered_cameras {len(registered_cameras)}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # silencia log de acesso padrão
+
+
+def start_metrics_server():
+    """Sobe o endpoint /metrics em daemon thread."""
+    server = http.server.ThreadingHTTPServer(("0.0.0.0", METRICS_PORT), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info("Métricas em http://0.0.0.0:%d/metrics", METRICS_PORT)
+    return server
+
+
+class OnvifProbeError(Exception):
+    """Falha ao conectar via ONVIF; reason é "auth" ou "not_onvif"."""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def is_auth_error(exc):
+    """
+    True se a falha é de credencial: HTTP 401 ou SOAP fault NotAuthorized.
+    O onvif-zeep embrulha o erro original em ONVIFError, então percorre a
+    cadeia de exceções até achar o status HTTP ou o fault do zeep.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, Fault):
+            codes = [exc.code] + list(exc.subcodes or [])
+            # "{ns}NotAuthorized" ou "ter:NotAuthorized" → "NotAuthorized"
+            if any(re.split(r"[}:]", str(c))[-1] in AUTH_FAULT_CODES for c in codes if c):
+                return True
+        response = getattr(exc, "response", None)
+        status = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+        if status == 401:
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def connect_onvif(host, port):
+    """
+    Conecta via ONVIF tentando as credenciais em ordem, começando pela que
+    já funcionou neste host. Retorna (câmera, device_info, (usuário, senha)).
+    """
+    known = host_credentials.get(host)
+    candidates = ONVIF_CREDENTIALS
+    if known:
+        candidates = [known] + [c for c in ONVIF_CREDENTIALS if c != known]
+
+    for user, password in candidates:
+        try:
+            cam = ONVIFCamera(host, port, user, password)
+            device_info = cam.devicemgmt.GetDeviceInformation()
+        except Exception as e:
+            if is_auth_error(e):
+                continue
+            # não fala ONVIF: outras credenciais não mudam o resultado
+            raise OnvifProbeError("not_onvif") from e
+        host_credentials[host] = (user, password)
+        return cam, device_info, (user, password)
+
+    host_credentials.pop(host, None)
+    raise OnvifProbeError("auth")
+
+
+def in_backoff(host, port):
+    entry = negative_cache.get((host, port))
+    return entry is not None and time.monotonic() < entry["until"]
+
+
+def mark_failure(host, port, reason):
+    """Coloca host:porta em backoff exponencial."""
+    failures = negative_cache.get((host, port), {}).get("failures", 0) + 1
+    delay = min(NEGATIVE_BACKOFF_BASE * 2 ** (failures - 1), NEGATIVE_BACKOFF_MAX)
+    negative_cache[(host, port)] = {
+        "failures": failures,
+        "reason": reason,
+        "until": time.monotonic() + delay,
+    }
+    logger.info(
+        "%s:%d em backoff por %ds (%s, %d falha(s))",
+        host, port, delay, reason, failures,
+    )
+
+
+def mark_success(host, port):
+    negative_cache.pop((host, port), None)
+
 
 def scan_onvif_host(host, port, timeout=2):
     """Tenta conectar em um host:port para verificar se é uma câmera ONVIF."""
@@ -47,16 +325,19 @@ def scan_onvif_host(host, port, timeout=2):
         sock.close()
         if result == 0:
             # Porta aberta — tenta criar uma conexão ONVIF
-            try:
-                cam = ONVIFCamera(host, port, ONVIF_USER, ONVIF_PASSWORD)
-                device_info = cam.devicemgmt.GetDeviceInformation()
+            with span("onvif_handshake", host=host, port=port) as sp:
+                try:
+                    cam, device_info, _ = connect_onvif(host, port)
+                except OnvifProbeError as e:
+                    sp["status"] = e.reason
+                    mark_failure(host, port, e.reason)
+                    return None
+                mark_success(host, port)
                 logger.info(
                     "Câmera ONVIF encontrada: %s:%d — %s %s",
                     host, port, device_info.Manufacturer, device_info.Model,
                 )
-                return {"host": host, "port": port, "info": device_info}
-            except Exception:
-                return None
+                return {"host": host, "port": port, "info": device_info, "camera": cam}
     except Exception:
         pass
     return None
@@ -78,25 +359,81 @@ def parse_scan_range(scan_range):
     return [f"{prefix}{i}" for i in range(start, end + 1)]
 
 
-def discover_by_ws_discovery():
-    """Tenta descoberta via WS-Discovery (multicast)."""
+def service_to_cameras(service):
+    """Extrai host/porta das XAddrs de um serviço WS-Discovery."""
+    cameras = []
+    for addr in service.getXAddrs():
+        parsed = urlparse(addr)
+        host = parsed.hostname
+        port = parsed.port or 80
+        if host:
+            cameras.append({"host": host, "port": port})
+    return cameras
+
+
+def on_ws_hello(service):
+    """
+    Callback do listener: câmera anunciou entrada na rede (Hello).
+    Roda na thread de rede do WSDiscovery — uma exceção aqui a derrubaria.
+    """
+    try:
+        cameras = service_to_cameras(service)
+        if cameras:
+            ws_services[service.getEPR()] = [c["host"] for c in cameras]
+            for cam in cameras:
+                logger.info("WS-Discovery Hello: %s:%s", cam["host"], cam["port"])
+            ws_events.put(("hello", cameras))
+    except Exception as e:
+        logger.error("Erro ao tratar Hello WS-Discovery: %s", e)
+
+
+def on_ws_bye(epr):
+    """
+    Callback do listener: câmera anunciou saída da rede (Bye).
+    O WSDiscovery passa só o EPR (string), não o serviço.
+    """
+    try:
+        hosts = ws_services.pop(epr, [])
+        if hosts:
+            logger.info("WS-Discovery Bye: %s", ", ".join(hosts))
+            ws_events.put(("bye", hosts))
+    except Exception as e:
+        logger.error("Erro ao tratar Bye WS-Discovery: %s", e)
+
+
+def start_ws_listener():
+    """
+    Sobe um WSDiscovery permanente que escuta Hello/Bye em todas as
+    interfaces locais. Retorna None se multicast não estiver disponível.
+    """
     try:
         from wsdiscovery import WSDiscovery
 
         wsd = WSDiscovery()
+        wsd.setRemoteServiceHelloCallback(on_ws_hello)
+        wsd.setRemoteServiceByeCallback(on_ws_bye)
         wsd.start()
-        services = wsd.searchServices(timeout=5)
-        wsd.stop()
+        logger.info("WS-Discovery: listener passivo iniciado")
+        return wsd
+    except Exception as e:
+        logger.warning("WS-Discovery indisponível: %s", e)
+        return None
+
+
+def discover_by_ws_discovery(wsd):
+    """Probe ativo via WS-Discovery, enviado em paralelo por todas as interfaces."""
+    try:
+        with span("ws_discovery", timeout=WSD_PROBE_TIMEOUT):
+            services = wsd.searchServices(timeout=WSD_PROBE_TIMEOUT)
 
         cameras = []
         for service in services:
-            for addr in service.getXAddrs():
-                parsed = urlparse(addr)
-                host = parsed.hostname
-                port = parsed.port or 80
-                if host:
-                    cameras.append({"host": host, "port": port})
-                    logger.info("WS-Discovery: dispositivo em %s:%s", host, port)
+            found = service_to_cameras(service)
+            if found:
+                ws_services[service.getEPR()] = [c["host"] for c in found]
+            for cam in found:
+                logger.info("WS-Discovery: dispositivo em %s:%s", cam["host"], cam["port"])
+            cameras += found
         return cameras
     except Exception as e:
         logger.warning("WS-Discovery falhou: %s", e)
@@ -112,25 +449,36 @@ def discover_by_scan():
     logger.info("Escaneando %d IPs no range %s...", len(hosts), SCAN_RANGE)
 
     cameras = []
-    with ThreadPoolExecutor(max_workers=50) as executor:
+    with span(
+        "scan", hosts=len(hosts), probes=len(hosts) * len(ONVIF_PORTS),
+        workers=SCAN_WORKERS,
+    ) as sp, ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
         futures = {}
+        skipped = 0
         for host in hosts:
             for port in ONVIF_PORTS:
+                # já registrada, ou não-câmera/credencial ruim ainda em backoff
+                if host in registered_cameras or in_backoff(host, port):
+                    skipped += 1
+                    continue
                 future = executor.submit(scan_onvif_host, host, port)
                 futures[future] = (host, port)
+        sp["skipped"] = skipped
 
         for future in as_completed(futures):
             result = future.result()
             if result:
                 cameras.append(result)
+        sp["found"] = len(cameras)
 
     return cameras
 
 
-def get_rtsp_uri(host, port, user, password):
-    """Obtém a URI RTSP de uma câmera ONVIF."""
+def get_rtsp_uri(host, port, user, password, camera=None):
+    """Obtém a URI RTSP de uma câmera ONVIF (reaproveita `camera` se já conectada)."""
     try:
-        camera = ONVIFCamera(host, port, user, password)
+        if camera is None:
+            camera = ONVIFCamera(host, port, user, password)
         media_service = camera.create_media_service()
 
         profiles = media_service.GetProfiles()
@@ -190,47 +538,142 @@ def register_in_mediamtx(camera_name, rtsp_uri):
         return False
 
 
+def unregister_from_mediamtx(camera_name):
+    """Remove um stream do MediaMTX via API."""
+    url = f"{MEDIAMTX_API}/v3/config/paths/delete/{camera_name}"
+    try:
+        resp = requests.delete(url, timeout=5)
+        if resp.status_code in (200, 204, 404):
+            logger.info("Câmera '%s' removida do MediaMTX", camera_name)
+            return True
+        logger.warning(
+            "Falha ao remover '%s': %s %s",
+            camera_name, resp.status_code, resp.text,
+        )
+        return False
+    except requests.RequestException as e:
+        logger.error("Erro ao comunicar com MediaMTX: %s", e)
+        return False
+
+
 def sanitize_name(host):
     """Gera um nome de câmera seguro a partir do host."""
     return "onvif-" + re.sub(r"[^a-zA-Z0-9]", "-", host)
 
 
+def register_cameras(cameras):
+    """
+    Obtém a URI RTSP e registra no MediaMTX as câmeras ainda não registradas.
+    As que falham ficam em pending_cameras para o próximo ciclo.
+    """
+    for cam in cameras:
+        host, port = cam["host"], cam["port"]
+        if host in registered_cameras:
+            pending_cameras.pop(host, None)
+            continue
+        pending_cameras[host] = cam
+        if in_backoff(host, port):
+            continue
+
+        with span("rtsp_uri", host=host) as sp:
+            camera = cam.get("camera")
+            if camera is None:
+                try:
+                    camera, _, _ = connect_onvif(host, port)
+                except OnvifProbeError as e:
+                    sp["status"] = e.reason
+                    mark_failure(host, port, e.reason)
+                    continue
+            user, password = host_credentials[host]
+            rtsp_uri = get_rtsp_uri(host, port, user, password, camera=camera)
+            if not rtsp_uri:
+                sp["status"] = "error"
+                mark_failure(host, port, "rtsp_uri")
+        if rtsp_uri:
+            name = sanitize_name(host)
+            with span("mediamtx_register", host=host) as sp:
+                ok = register_in_mediamtx(name, rtsp_uri)
+                if not ok:
+                    sp["status"] = "error"
+            if ok:
+                registered_cameras.add(host)
+                pending_cameras.pop(host, None)
+
+
+def unregister_cameras(hosts):
+    """Remove do MediaMTX câmeras que anunciaram saída (Bye)."""
+    for host in hosts:
+        pending_cameras.pop(host, None)
+        if host not in registered_cameras:
+            continue
+        if unregister_from_mediamtx(sanitize_name(host)):
+            registered_cameras.discard(host)
+
+
 def main():
     logger.info("ONVIF Discovery Service iniciado")
     logger.info("MediaMTX API: %s", MEDIAMTX_API)
-    logger.info("Usuário ONVIF: %s", ONVIF_USER)
+    logger.info(
+        "Credenciais ONVIF: %s",
+        ", ".join(user for user, _ in ONVIF_CREDENTIALS),
+    )
     logger.info("Scan range: %s", SCAN_RANGE or "(desabilitado)")
 
-    while True:
+    if METRICS_PORT:
         try:
-            # Tenta WS-Discovery primeiro, depois scan
-            cameras = discover_by_ws_discovery()
-            if not cameras and SCAN_RANGE:
-                cameras = discover_by_scan()
+            start_metrics_server()
+        except OSError as e:
+            # observabilidade é opcional: segue a descoberta sem /metrics
+            logger.warning("Métricas desabilitadas (porta %d): %s", METRICS_PORT, e)
 
-            logger.info("Encontradas %d câmeras na rede", len(cameras))
+    wsd = start_ws_listener()
+    next_cycle = 0
+    next_probe = 0
 
-            for cam in cameras:
-                host = cam["host"]
-                if host in registered_cameras:
-                    continue
+    while True:
+        # Aguarda anúncios do listener até o próximo ciclo periódico
+        try:
+            kind, payload = ws_events.get(
+                timeout=max(0, next_cycle - time.monotonic())
+            )
+        except queue.Empty:
+            kind, payload = None, None
 
-                rtsp_uri = get_rtsp_uri(
-                    host, cam["port"], ONVIF_USER, ONVIF_PASSWORD
-                )
-                if rtsp_uri:
-                    name = sanitize_name(host)
-                    if register_in_mediamtx(name, rtsp_uri):
-                        registered_cameras.add(host)
+        try:
+            if kind == "hello":
+                register_cameras(payload)
+                continue
+            if kind == "bye":
+                unregister_cameras(payload)
+                continue
+
+            # Ciclo periódico: probe ativo esparso, scan se WS-Discovery nada achou
+            start_cycle()
+            cycle_start = time.monotonic()
+            with span("cycle") as sp:
+                cameras = []
+                if wsd is not None and time.monotonic() >= next_probe:
+                    cameras = discover_by_ws_discovery(wsd)
+                    next_probe = time.monotonic() + WSD_PROBE_INTERVAL
+                if not ws_services and SCAN_RANGE:
+                    cameras = discover_by_scan()
+
+                logger.info("Encontradas %d câmeras na rede", len(cameras))
+                # inclui as pendentes de ciclos/anúncios anteriores (ex: MediaMTX fora do ar)
+                retry = {c["host"]: c for c in pending_cameras.values()}
+                retry.update((c["host"], c) for c in cameras)
+                register_cameras(list(retry.values()))
+                sp["cameras"] = len(cameras)
+            end_cycle(time.monotonic() - cycle_start)
 
         except Exception as e:
             logger.error("Erro no ciclo de descoberta: %s", e)
 
+        next_cycle = time.monotonic() + DISCOVERY_INTERVAL
         logger.info(
             "Próxima descoberta em %ds. Câmeras registradas: %d",
             DISCOVERY_INTERVAL, len(registered_cameras),
         )
-        time.sleep(DISCOVERY_INTERVAL)
 
 
 if __name__ == "__main__":
@@ -36,18 +36,27 @@ else
     exit 1
 fi
 
-# Registra dispositivos IoT no backend
-echo "Registrando dispositivos IoT no backend..."
-DEVICE_COUNT=$(yq '.devices | length' "$CONFIG_FILE")
-
-if [ "$DEVICE_COUNT" -gt 0 ]; then
-    DEVICES_JSON=$(yq -o=json '.devices' "$CONFIG_FILE")
-    REGISTER_PAYLOAD="{\"api_key\":\"$API_KEY\",\"devices\":$DEVICES_JSON}"
-    REGISTER_RESPONSE=$(wget -qO- \
-        --post-data="$REGISTER_PAYLOAD" \
+# Sincroniza dispositivos IoT com o backend: envia só o hash do conjunto
+# (name/type, sem URLs/credenciais); o conjunto completo vai apenas se o
+# backend responder "resync"
+echo "Sincronizando dispositivos IoT com o backend..."
+DEVICES_JSON=$(yq -o=json -I=0 '[.devices[] | {"name": .name, "type": .type}]' "$CONFIG_FILE")
+
+if [ "$DEVICES_JSON" != "[]" ]; then
+    DEVICES_HASH=$(printf '%s' "$DEVICES_JSON" | sha256sum | cut -d' ' -f1)
+    SYNC_URL="http://$RELAY_SERVER:3000/api/iot-devices/sync"
+    SYNC_RESPONSE=$(wget -qO- \
+        --post-data="{\"api_key\":\"$API_KEY\",\"version\":1,\"hash\":\"$DEVICES_HASH\"}" \
         --header="Content-Type: application/json" \
-        "http://$RELAY_SERVER:3000/api/iot-devices/register" 2>/dev/null) || true
-    echo "Resposta do registro: $REGISTER_RESPONSE"
+        "$SYNC_URL" 2>/dev/null) || true
+
+    if echo "$SYNC_RESPONSE" | grep -q '"status":"resync"'; then
+        SYNC_RESPONSE=$(wget -qO- \
+            --post-data="{\"api_key\":\"$API_KEY\",\"version\":1,\"hash\":\"$DEVICES_HASH\",\"devices\":$DEVICES_JSON}" \
+            --header="Content-Type: application/json" \
+            "$SYNC_URL" 2>/dev/null) || true
+    fi
+    echo "Resposta da sincronizacao: $SYNC_RESPONSE"
 else
     echo "AVISO: Nenhum dispositivo definido em $CONFIG_FILE"
 fi
@@ -62,16 +71,15 @@ echo "# Paths (gerado automaticamente de iot_devices.yml)" >> "$FINAL_CONFIG"
 echo "paths:" >> "$FINAL_CONFIG"
 
 CAMERA_COUNT=0
-for i in $(seq 0 $((DEVICE_COUNT - 1))); do
-    TYPE=$(yq ".devices[$i].type" "$CONFIG_FILE")
-    if [ "$TYPE" = "CAMERA" ]; then
-        NAME=$(yq ".devices[$i].name" "$CONFIG_FILE")
-        URL=$(yq ".devices[$i].url" "$CONFIG_FILE")
+# Uma única chamada ao yq para todas as câmeras ("nome url" por linha)
+CAMERAS=$(yq '.devices[] | select(.type == "CAMERA") | .name + " " + .url' "$CONFIG_FILE")
+while read -r NAME URL; do
+    [ -n "$NAME" ] || continue
 
-        echo "Configurando camera: $NAME ($URL)"
-        CAMERA_COUNT=$((CAMERA_COUNT + 1))
+    echo "Configurando camera: $NAME ($URL)"
+    CAMERA_COUNT=$((CAMERA_COUNT + 1))
 
-        cat >> "$FINAL_CONFIG" <<EOF
+    cat >> "$FINAL_CONFIG" <<EOF
   $NAME:
     source: $URL
     sourceOnDemand: false
@@ -81,8 +89,9 @@ for i in $(seq 0 $((DEVICE_COUNT - 1))); do
       rtsp://gateway:$API_KEY@$RELAY_SERVER:8554/$NAME
     runOnReadyRestart: true
 EOF
-    fi
-done
+done <<CAMERAS_EOF
+$CAMERAS
+CAMERAS_EOF
 
 if [ "$CAMERA_COUNT" -eq 0 ]; then
     echo "AVISO: Nenhum dispositivo do tipo CAMERA definido"
@@ -95,6 +95,20 @@ class GatewayBusiness {
     }
     return null;
   }
+
+  // Caminho quente (estados, sync): resolve o gateway pelo prefixo indexado
+  // da chave e faz um único bcrypt.compare, sem varrer todos os gateways.
+  async findByApiKey(apiKey) {
+    if (!apiKey) return null;
+
+    const candidates = await GatewayDao.findByApiKeyPrefix(apiKey.substring(0, 12));
+    for (const gateway of candidates) {
+      if (await bcrypt.compare(apiKey, gateway.api_key_hash)) {
+        return gateway;
+      }
+    }
+    return null;
+  }
 }
 
 module.exports = new GatewayBusiness();
@@ -1,5 +1,8 @@
 const IotDeviceDao = require("../dao/IotDeviceDao");
 const GatewayBusiness = require("./GatewayBusiness");
+const GatewayDao = require("../dao/GatewayDao");
+
+const SYNC_VERSION = 1;
 
 class IotDeviceBusiness {
   async findAll() {
@@ -27,6 +30,62 @@ class IotDeviceBusiness {
       throw { statusCode: 401, message: "API key inválida ou gateway inativo" };
     }
 
+    const results = await this._ensureDevices(gateway, devices);
+    return { gateway: gateway.name, registered: results };
+  }
+
+  // Protocolo de sincronização incremental (versão 1): o gateway envia o hash
+  // do seu conjunto de dispositivos e, quando tem a base anterior, só o delta.
+  async sync(apiKey, body = {}) {
+    const { version, hash, base_hash, added, removed, devices } = body;
+
+    if (!apiKey) {
+      throw { statusCode: 401, message: "API key obrigatória" };
+    }
+    if (version !== SYNC_VERSION) {
+      throw { statusCode: 400, message: "Versão de sincronização não suportada" };
+    }
+    if (!hash) {
+      throw { statusCode: 400, message: "Hash obrigatório" };
+    }
+
+    const gateway = await GatewayBusiness.findByApiKey(apiKey);
+    if (!gateway) {
+      throw { statusCode: 401, message: "API key inválida ou gateway inativo" };
+    }
+
+    if (gateway.devices_hash === hash) {
+      return { status: "unchanged" };
+    }
+
+    let created;
+    let deleted;
+    if (Array.isArray(devices)) {
+      // Sincronização completa: cria o que falta e remove o que sobrou
+      const wanted = new Set(devices.map((d) => `${d.type}:${d.name}`));
+      const current = await IotDeviceDao.findByGateway(gateway.id);
+      created = await this._ensureDevices(gateway, devices);
+      deleted = await this._removeDevices(
+        gateway,
+        current.filter((d) => !wanted.has(`${d.type}:${d.name}`))
+      );
+    } else if (base_hash && gateway.devices_hash === base_hash) {
+      created = await this._ensureDevices(gateway, added || []);
+      deleted = await this._removeDevices(gateway, removed || []);
+    } else {
+      // Base divergente (ou desconhecida): o gateway deve enviar o conjunto completo
+      return { status: "resync" };
+    }
+
+    await GatewayDao.updateDevicesHash(gateway.id, hash);
+    return {
+      status: "synced",
+      created: created.filter((d) => d.status === "created").length,
+      removed: deleted,
+    };
+  }
+
+  async _ensureDevices(gateway, devices) {
     const results = [];
     for (const device of devices) {
       const { name, type } = device;
@@ -50,8 +109,40 @@ class IotDeviceBusiness {
         results.push({ id: existing.id, name, type, status: "existing" });
       }
     }
+    return results;
+  }
 
-    return { gateway: gateway.name, registered: results };
+  async _removeDevices(gateway, devices) {
+    let count = 0;
+    for (const { name, type } of devices) {
+      if (!name || !type) continue;
+      if (await IotDeviceDao.deleteByNameTypeGateway(name, type, gateway.id)) {
+        count++;
+      }
+    }
+    return count;
+  }
+
+  async reportStates(apiKey, states) {
+    if (!apiKey) {
+      throw { statusCode: 401, message: "API key obrigatória" };
+    }
+    if (!Array.isArray(states) || states.length === 0) {
+      throw { statusCode: 400, message: "Lista de estados vazia" };
+    }
+
+    const gateway = await GatewayBusiness.findByApiKey(apiKey);
+    if (!gateway) {
+      throw { statusCode: 401, message: "API key inválida ou gateway inativo" };
+    }
+
+    const now = Math.floor(Date.now() / 1000);
+    const valid = states
+      .filter((s) => s && s.name && s.type && s.state !== undefined)
+      .map(({ name, type, state, ts }) => ({ name, type, state, ts: ts || now }));
+
+    const updated = await IotDeviceDao.updateStates(gateway.id, valid);
+    return { updated };
   }
 
   async update(id, { description }) {
@@ -63,10 +154,11 @@ class IotDeviceBusiness {
   }
 
   async delete(id) {
-    const deleted = await IotDeviceDao.delete(id);
-    if (!deleted) {
-      throw { statusCode: 404, message: "Dispositivo não encontrado" };
-    }
+    const device = await this.findById(id);
+    await IotDeviceDao.delete(id);
+
+    // Invalida o hash: o próximo sync do gateway recria o dispositivo, se ainda configurado
+    await GatewayDao.updateDevicesHash(device.gateway_id, null);
     return true;
   }
 }
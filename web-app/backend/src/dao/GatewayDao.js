@@ -4,7 +4,7 @@ class GatewayDao {
   async findAll() {
     const result = await getPool().query(
       `SELECT g.id, g.name, g.api_key_prefix, g.active, g.created_at, g.last_seen_at,
-              g.organizacao_fk, g.local_api_url, o.description AS organization_description
+              g.organizacao_fk, g.local_api_url, g.local_webrtc_url, o.description AS organization_description
        FROM gateways g
        LEFT JOIN organizations o ON o.id = g.organizacao_fk
        ORDER BY g.created_at DESC`
@@ -15,7 +15,7 @@ class GatewayDao {
   async findById(id) {
     const result = await getPool().query(
       `SELECT g.id, g.name, g.api_key_hash, g.api_key_prefix, g.active, g.created_at, g.last_seen_at,
-              g.organizacao_fk, g.local_api_url, o.description AS organization_description
+              g.organizacao_fk, g.local_api_url, g.local_webrtc_url, o.description AS organization_description
        FROM gateways g
        LEFT JOIN organizations o ON o.id = g.organizacao_fk
        WHERE g.id = $1`,
@@ -55,6 +55,20 @@ class GatewayDao {
     );
   }
 
+  async updateLocalWebrtc(id, url, paths) {
+    await getPool().query(
+      "UPDATE gateways SET local_webrtc_url = $1, local_webrtc_paths = $2 WHERE id = $3",
+      [url, JSON.stringify(paths), id]
+    );
+  }
+
+  async updateDevicesHash(id, hash) {
+    await getPool().query(
+      "UPDATE gateways SET devices_hash = $1 WHERE id = $2",
+      [hash, id]
+    );
+  }
+
   async delete(id) {
     const result = await getPool().query(
       "DELETE FROM gateways WHERE id = $1 RETURNING id",
@@ -65,7 +79,15 @@ class GatewayDao {
 
   async findAllWithHash() {
     const result = await getPool().query(
-      "SELECT id, name, api_key_hash, active FROM gateways WHERE active = true"
+      "SELECT id, name, api_key_hash, active, devices_hash FROM gateways WHERE active = true"
+    );
+    return result.rows;
+  }
+
+  async findByApiKeyPrefix(prefix) {
+    const result = await getPool().query(
+      "SELECT id, name, api_key_hash, active, devices_hash FROM gateways WHERE api_key_prefix = $1 AND active = true",
+      [prefix]
     );
     return result.rows;
   }
@@ -4,7 +4,11 @@ class IotDeviceDao {
   async findAll() {
     const { rows } = await getPool().query(
       `SELECT d.id, d.name, d.type, d.description, d.gateway_id,
-              g.name AS gateway_name, g.local_api_url AS gateway_local_api_url
+              d.state, d.state_updated_at,
+              g.name AS gateway_name, g.local_api_url AS gateway_local_api_url,
+              CASE WHEN g.local_webrtc_paths ? d.name
+                   THEN g.local_webrtc_url || '/' || d.name
+              END AS local_webrtc_url
        FROM iot_devices d
        JOIN gateways g ON g.id = d.gateway_id
        ORDER BY g.name, d.type, d.name`
@@ -15,7 +19,11 @@ class IotDeviceDao {
   async findById(id) {
     const { rows } = await getPool().query(
       `SELECT d.id, d.name, d.type, d.description, d.gateway_id,
-              g.name AS gateway_name, g.local_api_url AS gateway_local_api_url
+              d.state, d.state_updated_at,
+              g.name AS gateway_name, g.local_api_url AS gateway_local_api_url,
+              CASE WHEN g.local_webrtc_paths ? d.name
+                   THEN g.local_webrtc_url || '/' || d.name
+              END AS local_webrtc_url
        FROM iot_devices d
        JOIN gateways g ON g.id = d.gateway_id
        WHERE d.id = $1`,
@@ -32,6 +40,14 @@ class IotDeviceDao {
     return rows[0] || null;
   }
 
+  async findByGateway(gateway_id) {
+    const { rows } = await getPool().query(
+      "SELECT id, name, type FROM iot_devices WHERE gateway_id = $1",
+      [gateway_id]
+    );
+    return rows;
+  }
+
   async create({ name, type, description, gateway_id }) {
     const { rows } = await getPool().query(
       "INSERT INTO iot_devices (name, type, description, gateway_id) VALUES ($1, $2, $3, $4) RETURNING id, name, type, description, gateway_id",
@@ -48,6 +64,24 @@ class IotDeviceDao {
     return rows[0] || null;
   }
 
+  async updateStates(gateway_id, states) {
+    const { rowCount } = await getPool().query(
+      `UPDATE iot_devices d SET state = s.state, state_updated_at = to_timestamp(s.ts)
+       FROM jsonb_to_recordset($2::jsonb) AS s(name text, type text, state jsonb, ts bigint)
+       WHERE d.gateway_id = $1 AND d.name = s.name AND d.type = s.type`,
+      [gateway_id, JSON.stringify(states)]
+    );
+    return rowCount;
+  }
+
+  async deleteByNameTypeGateway(name, type, gateway_id) {
+    const { rowCount } = await getPool().query(
+      "DELETE FROM iot_devices WHERE name = $1 AND type = $2 AND gateway_id = $3",
+      [name, type, gateway_id]
+    );
+    return rowCount > 0;
+  }
+
   async delete(id) {
     const { rowCount } = await getPool().query(
       "DELETE FROM iot_devices WHERE id = $1",
@@ -0,0 +1,10 @@
+exports.up = async (pgm) => {
+  pgm.addColumns("iot_devices", {
+    state: { type: "jsonb" },
+    state_updated_at: { type: "timestamptz" },
+  });
+};
+
+exports.down = async (pgm) => {
+  pgm.dropColumns("iot_devices", ["state", "state_updated_at"]);
+};
@@ -0,0 +1,10 @@
+exports.up = async (pgm) => {
+  pgm.addColumns("gateways", {
+    local_webrtc_url: { type: "text" },
+    local_webrtc_paths: { type: "jsonb" },
+  });
+};
+
+exports.down = async (pgm) => {
+  pgm.dropColumns("gateways", ["local_webrtc_url", "local_webrtc_paths"]);
+};
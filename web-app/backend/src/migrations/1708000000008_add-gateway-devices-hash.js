@@ -0,0 +1,7 @@
+exports.up = async (pgm) => {
+  pgm.addColumns("gateways", { devices_hash: { type: "text" } });
+};
+
+exports.down = async (pgm) => {
+  pgm.dropColumns("gateways", ["devices_hash"]);
+};
@@ -0,0 +1,7 @@
+exports.up = async (pgm) => {
+  pgm.createIndex("gateways", "api_key_prefix");
+};
+
+exports.down = async (pgm) => {
+  pgm.dropIndex("gateways", "api_key_prefix");
+};
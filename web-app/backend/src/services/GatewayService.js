@@ -52,7 +52,8 @@ async function gatewayService(fastify) {
   // POST /api/gateways/auth — gateway valida sua key (público)
   fastify.post("/api/gateways/auth", async (request, reply) => {
     try {
-      const { api_key, local_api_url } = request.body || {};
+      const { api_key, local_api_url, local_webrtc_url, local_webrtc_paths } =
+        request.body || {};
       const gateway = await GatewayBusiness.validateApiKey(api_key);
       if (!gateway) {
         return reply.code(401).send({ error: "API key inválida ou gateway inativo" });
@@ -60,6 +61,9 @@ async function gatewayService(fastify) {
       if (local_api_url) {
         await GatewayDao.updateLocalApiUrl(gateway.id, local_api_url);
       }
+      // Sem URL anunciada, limpa a anterior para o player não tentar um endpoint velho
+      const paths = Array.isArray(local_webrtc_paths) ? local_webrtc_paths : [];
+      await GatewayDao.updateLocalWebrtc(gateway.id, local_webrtc_url || null, paths);
       return { valid: true, id: gateway.id, name: gateway.name };
     } catch (err) {
       return reply.code(500).send({ error: "Erro interno" });
@@ -16,6 +16,32 @@ async function iotDeviceService(fastify) {
     }
   });
 
+  // POST /api/iot-devices/sync — sincronização incremental por hash (público, auth via api_key)
+  fastify.post("/api/iot-devices/sync", async (request, reply) => {
+    try {
+      const { api_key, ...body } = request.body || {};
+      const result = await IotDeviceBusiness.sync(api_key, body);
+      return reply.code(200).send(result);
+    } catch (err) {
+      return reply
+        .code(err.statusCode || 500)
+        .send({ error: err.message || "Erro interno" });
+    }
+  });
+
+  // POST /api/iot-devices/state — gateway reporta mudanças de estado em lote (público, auth via api_key)
+  fastify.post("/api/iot-devices/state", async (request, reply) => {
+    try {
+      const { api_key, states } = request.body || {};
+      const result = await IotDeviceBusiness.reportStates(api_key, states);
+      return reply.code(200).send(result);
+    } catch (err) {
+      return reply
+        .code(err.statusCode || 500)
+        .send({ error: err.message || "Erro interno" });
+    }
+  });
+
   // GET /api/iot-devices — lista todos os dispositivos (protegido)
   fastify.get("/api/iot-devices", auth, async () => {
     return IotDeviceBusiness.findAll();
@@ -132,7 +132,7 @@ function CameraCard({ device, cfg, navigate }) {
       </div>
 
       {device.ready ? (
-        <WebRTCPlayer path={device.path} />
+        <WebRTCPlayer path={device.path} localUrl={device.local_webrtc_url} />
       ) : (
         <div style={styles.offlinePlaceholder}>
           <svg width="40" height="40" viewBox="0 0 24 24" fill="none" stroke="#444" strokeWidth="1.5">
@@ -150,7 +150,12 @@ function CameraCard({ device, cfg, navigate }) {
         <span style={styles.gatewayLabel}>{device.gateway_name}</span>
         <button
           style={{ ...styles.expandBtn, ...(device.ready ? {} : styles.expandBtnDisabled) }}
-          onClick={() => device.ready && navigate(`/cameras/${device.path}`)}
+          onClick={() =>
+            device.ready &&
+            navigate(`/cameras/${device.path}`, {
+              state: { localUrl: device.local_webrtc_url },
+            })
+          }
           disabled={!device.ready}
           title="Expandir"
         >
@@ -168,7 +173,20 @@ function CameraCard({ device, cfg, navigate }) {
 
 // ─── Card: Outros dispositivos ────────────────────────────────────────────────
 
+// Estado reportado pelo gateway (polling IoT) → rótulo exibido no card
+function stateLabel(device) {
+  const state = device.state;
+  if (!state) return "Registrado";
+  if (!state.online) return "Offline";
+  if (state.switch !== undefined) return state.switch === "on" ? "Ligado" : "Desligado";
+  if (state.presence !== undefined) return state.presence ? "Presença detectada" : "Sem presença";
+  return "Online";
+}
+
 function GenericCard({ device, cfg }) {
+  const offline = device.state && !device.state.online;
+  const statusColor = offline ? "#555" : cfg.color;
+
   return (
     <div style={{ ...styles.card, borderColor: cfg.color }}>
       <div style={{ ...styles.cardHeader, background: cfg.headerBg }}>
@@ -192,9 +210,9 @@ function GenericCard({ device, cfg }) {
         </div>
         <div style={styles.infoRow}>
           <span style={styles.infoKey}>Status</span>
-          <span style={{ ...styles.statusLabel, color: cfg.color }}>
-            <span style={{ ...styles.statusDotSmall, background: cfg.color }} />
-            Registrado
+          <span style={{ ...styles.statusLabel, color: statusColor }}>
+            <span style={{ ...styles.statusDotSmall, background: statusColor }} />
+            {stateLabel(device)}
           </span>
         </div>
       </div>
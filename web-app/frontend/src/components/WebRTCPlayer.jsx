@@ -1,49 +1,105 @@
 import { useEffect, useRef, useState } from "react";
 
-function WebRTCPlayer({ path }) {
-  const videoRef = useRef(null);
-  const [error, setError] = useState(false);
+// Tempo máximo para tentar o playback direto no gateway (LAN) antes do relay
+const LOCAL_TIMEOUT_MS = 2000;
 
-  useEffect(() => {
-    if (!path) return;
+function createPeer(videoRef) {
+  const pc = new RTCPeerConnection({
+    iceServers: [{ urls: "stun:stun.l.google.com:19302" }],
+  });
 
-    const pc = new RTCPeerConnection({
-      iceServers: [{ urls: "stun:stun.l.google.com:19302" }],
-    });
+  pc.addTransceiver("video", { direction: "recvonly" });
+  pc.addTransceiver("audio", { direction: "recvonly" });
+
+  pc.ontrack = (event) => {
+    if (videoRef.current) {
+      videoRef.current.srcObject = event.streams[0];
+    }
+  };
 
-    pc.addTransceiver("video", { direction: "recvonly" });
-    pc.addTransceiver("audio", { direction: "recvonly" });
+  return pc;
+}
+
+async function negotiate(pc, whepUrl, signal) {
+  const offer = await pc.createOffer();
+  await pc.setLocalDescription(offer);
+
+  const res = await fetch(whepUrl, {
+    method: "POST",
+    headers: { "Content-Type": "application/sdp" },
+    body: offer.sdp,
+    signal,
+  });
+
+  if (!res.ok) {
+    throw new Error(`WHEP ${res.status}`);
+  }
+
+  const answer = await res.text();
+  await pc.setRemoteDescription({ type: "answer", sdp: answer });
+}
 
-    pc.ontrack = (event) => {
-      if (videoRef.current) {
-        videoRef.current.srcObject = event.streams[0];
+function waitConnected(pc, timeoutMs) {
+  return new Promise((resolve, reject) => {
+    if (pc.connectionState === "connected") return resolve();
+
+    const timer = setTimeout(() => reject(new Error("timeout")), timeoutMs);
+    pc.addEventListener("connectionstatechange", () => {
+      if (pc.connectionState === "connected") {
+        clearTimeout(timer);
+        resolve();
+      } else if (pc.connectionState === "failed") {
+        clearTimeout(timer);
+        reject(new Error("failed"));
       }
-    };
+    });
+  });
+}
+
+// localUrl: endpoint WHEP do MediaMTX do gateway na LAN (quando alcançável,
+// evita o relay na nuvem); sem ele, ou se falhar, usa /webrtc do servidor central.
+// Em página https um localUrl http seria bloqueado como conteúdo misto: ignora.
+function usableLocalUrl(localUrl) {
+  if (!localUrl) return null;
+  if (window.location.protocol === "https:" && localUrl.startsWith("http:")) return null;
+  return localUrl;
+}
 
-    const negotiate = async () => {
-      const offer = await pc.createOffer();
-      await pc.setLocalDescription(offer);
+function WebRTCPlayer({ path, localUrl }) {
+  const videoRef = useRef(null);
+  const [error, setError] = useState(false);
 
-      const whepUrl = `/webrtc/${path}/whep`;
+  useEffect(() => {
+    if (!path) return;
 
-      const res = await fetch(whepUrl, {
-        method: "POST",
-        headers: { "Content-Type": "application/sdp" },
-        body: offer.sdp,
-      });
+    let pc = null;
+    let cancelled = false;
 
-      if (res.ok) {
-        const answer = await res.text();
-        await pc.setRemoteDescription({ type: "answer", sdp: answer });
-      } else {
-        setError(true);
+    const play = async () => {
+      const local = usableLocalUrl(localUrl);
+      if (local) {
+        pc = createPeer(videoRef);
+        try {
+          await negotiate(pc, `${local}/whep`, AbortSignal.timeout(LOCAL_TIMEOUT_MS));
+          await waitConnected(pc, LOCAL_TIMEOUT_MS);
+          return;
+        } catch {
+          pc.close();
+          if (cancelled) return;
+        }
       }
+
+      pc = createPeer(videoRef);
+      await negotiate(pc, `/webrtc/${path}/whep`);
     };
 
-    negotiate().catch(() => setError(true));
+    play().catch(() => !cancelled && setError(true));
 
-    return () => pc.close();
-  }, [path]);
+    return () => {
+      cancelled = true;
+      if (pc) pc.close();
+    };
+  }, [path, localUrl]);
 
   if (error) {
     return (
@@ -1,14 +1,15 @@
-import { useParams, useNavigate } from "react-router-dom";
+import { useParams, useNavigate, useLocation } from "react-router-dom";
 import WebRTCPlayer from "../components/WebRTCPlayer.jsx";
 
 function CameraView() {
   const { path } = useParams();
   const navigate = useNavigate();
+  const location = useLocation();
 
   return (
     <div style={styles.container}>
       <div style={styles.videoArea}>
-        <WebRTCPlayer path={path} />
+        <WebRTCPlayer path={path} localUrl={location.state?.localUrl} />
       </div>
 
       <div style={styles.actionBar}>